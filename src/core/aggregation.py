@@ -0,0 +1,373 @@
+import csv
+import io
+import json
+import math
+import os
+import tempfile
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Iterator, Deque, Tuple
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class P2Quantile:
+    """Streaming quantile estimate with the P-square algorithm (5 markers)."""
+
+    def __init__(self, p: float):
+        self.p = p
+        self.q: List[float] = []
+        self.n = [0, 1, 2, 3, 4]
+        self.np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self.dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        q, n = self.q, self.n
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(1, 5) if x < q[i]) - 1
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.np[i] += self.dn[i]
+
+        for i in range(1, 4):
+            d = self.np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    @property
+    def value(self) -> Optional[float]:
+        if not self.q:
+            return None
+        if len(self.q) < 5:
+            return self.q[min(len(self.q) - 1, int(self.p * len(self.q)))]
+        return self.q[2]
+
+
+class SignalStats:
+    """Incremental count/mean/variance (Welford), min/max and P2 percentiles."""
+
+    def __init__(self, window_start: float = 0.0, window_end: float = 0.0):
+        self.window_start = window_start
+        self.window_end = window_end
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._quantiles = {p: P2Quantile(p) for p in QUANTILES}
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        for est in self._quantiles.values():
+            est.add(value)
+
+    def merge(self, other: "SignalStats") -> None:
+        """Fold ``other`` in (Chan et al.); percentile sketches do not merge."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> Optional[float]:
+        if self.count < 2:
+            return None
+        return self._m2 / (self.count - 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        var = self.variance
+        out = {
+            "window_start": self.window_start,
+            "window_end": self.window_end,
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "variance": var,
+            "std": math.sqrt(var) if var is not None else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for p, est in self._quantiles.items():
+            out[f"p{round(p * 100):g}"] = est.value
+        return out
+
+
+class SampleSpool:
+    """On-disk log of raw samples, read back in columnar chunks.
+
+    Rows go to temp-file segments of ``max_rows // 2`` rows; once a third
+    segment would be needed the oldest one is dropped, so the spool keeps
+    the most recent ``max_rows // 2`` to ``max_rows`` samples (``0`` keeps
+    everything).
+    """
+
+    COLUMNS = ("time", "received", "key", "value")
+
+    def __init__(self, max_rows: int = 1_000_000):
+        self.max_rows = int(max_rows)
+        self.segments: List[List[Any]] = []  # [path, rows]
+        self._fh = None
+        self._writer = None
+        self._open_segment()
+
+    @property
+    def rows(self) -> int:
+        return sum(n for _, n in self.segments)
+
+    def _open_segment(self) -> None:
+        fd, path = tempfile.mkstemp(prefix="plotune_arduino_", suffix=".csv")
+        os.close(fd)
+        self._fh = open(path, "w", newline="")
+        self._writer = csv.writer(self._fh)
+        self.segments.append([path, 0])
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            # still open by a running export (Windows)
+            pass
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        if len(self.segments) >= 2:
+            self._remove(self.segments.pop(0)[0])
+        self._open_segment()
+
+    def append(self, ts: float, received: float, key: str, value: float) -> None:
+        if self.max_rows and self.segments[-1][1] >= max(1, self.max_rows // 2):
+            self._rotate()
+        self._writer.writerow((repr(ts), repr(received), key, repr(value)))
+        self.segments[-1][1] += 1
+
+    def snapshot(self) -> List[Tuple[str, int]]:
+        """Flush and return ``(path, rows)`` per segment for ``iter_chunks``.
+
+        Call this on the writing thread; the reader then never touches the
+        writer and ignores rows appended afterwards.
+        """
+        if not self._fh.closed:
+            self._fh.flush()
+        return [(path, n) for path, n in self.segments]
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self._fh.close()
+        for path, _ in self.segments:
+            self._remove(path)
+        self.segments = []
+
+    def iter_chunks(
+        self,
+        snapshot: List[Tuple[str, int]],
+        chunk_size: int = 5000,
+        keys: Optional[List[str]] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Iterator[Dict[str, list]]:
+        """Yield ``{"time": [...], "received": [...], ...}`` chunks.
+
+        ``start``/``end`` filter on the host ``received`` time, like the
+        statistics windows. Segment files are opened here, so the export
+        survives a later rotation or ``close`` on platforms that allow it.
+        """
+        files = []
+        for path, limit in snapshot:
+            try:
+                files.append((open(path, "r", newline=""), limit))
+            except FileNotFoundError:
+                continue
+        return self._read_chunks(files, chunk_size, keys, start, end)
+
+    def _read_chunks(
+        self,
+        files: List[Tuple[Any, int]],
+        chunk_size: int,
+        keys: Optional[List[str]],
+        start: Optional[float],
+        end: Optional[float],
+    ) -> Iterator[Dict[str, list]]:
+        wanted = set(keys) if keys else None
+        chunk: Dict[str, list] = {c: [] for c in self.COLUMNS}
+
+        for fh, limit in files:
+            with fh:
+                for i, (ts, received, key, value) in enumerate(csv.reader(fh)):
+                    if i >= limit:
+                        break
+                    if wanted is not None and key not in wanted:
+                        continue
+                    received_f = float(received)
+                    if (start is not None and received_f < start) or (
+                        end is not None and received_f >= end
+                    ):
+                        continue
+                    chunk["time"].append(float(ts))
+                    chunk["received"].append(received_f)
+                    chunk["key"].append(key)
+                    chunk["value"].append(float(value))
+                    if len(chunk["time"]) >= chunk_size:
+                        yield chunk
+                        chunk = {c: [] for c in self.COLUMNS}
+        if chunk["time"]:
+            yield chunk
+
+
+def iter_csv(chunks: Iterator[Dict[str, list]]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(SampleSpool.COLUMNS)
+    for chunk in chunks:
+        writer.writerows(zip(*(chunk[c] for c in SampleSpool.COLUMNS)))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def iter_ndjson(chunks: Iterator[Dict[str, list]]) -> Iterator[str]:
+    for chunk in chunks:
+        yield json.dumps(chunk) + "\n"
+
+
+class WindowAggregator:
+    """Per-signal statistics over tumbling windows plus a raw sample spool.
+
+    Windows are keyed on host arrival time (epoch seconds): device clocks
+    such as ``millis()`` use other units and restart with the board. The
+    device time is kept in the spooled rows only.
+    """
+
+    def __init__(
+        self,
+        window: float = 10.0,
+        history: int = 60,
+        spool: bool = True,
+        max_rows: int = 1_000_000,
+    ):
+        self.window = float(window)
+        self.history = int(history)
+        self.max_rows = int(max_rows)
+        self.current: Dict[str, SignalStats] = {}
+        self.closed: Dict[str, Deque[SignalStats]] = {}
+        self.total: Dict[str, SignalStats] = {}
+        self.spool: Optional[SampleSpool] = SampleSpool(max_rows) if spool else None
+
+    def _bounds(self, ts: float) -> Tuple[float, float]:
+        start = math.floor(ts / self.window) * self.window
+        return start, start + self.window
+
+    def add(
+        self, key: str, value: float, ts: float, received: Optional[float] = None
+    ) -> None:
+        # nan/inf are valid serial floats but poison the statistics and are
+        # not JSON serializable
+        if not (math.isfinite(value) and math.isfinite(ts)):
+            return
+        if received is None:
+            received = time.time()
+
+        cur = self.current.get(key)
+        # a host clock stepping back folds into the open window instead of
+        # reopening an already closed one
+        if cur is None or received >= cur.window_end:
+            if cur is not None:
+                self.closed.setdefault(key, deque(maxlen=self.history)).append(cur)
+            cur = self.current[key] = SignalStats(*self._bounds(received))
+        cur.add(value)
+
+        if key not in self.total:
+            self.total[key] = SignalStats(received, received)
+        tot = self.total[key]
+        tot.window_start = min(tot.window_start, received)
+        tot.window_end = max(tot.window_end, received)
+        tot.add(value)
+
+        if self.spool is not None:
+            self.spool.append(ts, received, key, value)
+
+    def signals(self) -> List[str]:
+        return list(self.total)
+
+    def stats(
+        self,
+        key: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Session ``total`` plus the windows overlapping [start, end).
+
+        When a range is given, ``range`` merges the selected windows: count,
+        mean, variance and min/max are exact over whole windows (its
+        ``window_start``/``window_end`` show the span actually covered, which
+        is also limited by ``history``); percentiles cannot be merged from
+        the sketches and are ``None``. ``total`` always covers the session.
+        """
+        if key not in self.total:
+            return None
+        windows = list(self.closed.get(key, ())) + [self.current[key]]
+        if start is not None:
+            windows = [w for w in windows if w.window_end > start]
+        if end is not None:
+            windows = [w for w in windows if w.window_start < end]
+        out = {
+            "key": key,
+            "window": self.window,
+            "total": self.total[key].to_dict(),
+            "windows": [w.to_dict() for w in windows],
+        }
+        if start is not None or end is not None:
+            merged = SignalStats(
+                windows[0].window_start if windows else start or 0.0,
+                windows[-1].window_end if windows else end or 0.0,
+            )
+            for w in windows:
+                merged.merge(w)
+            out["range"] = merged.to_dict()
+        return out
+
+    def reset(self) -> None:
+        """Drop all statistics and start a fresh spool."""
+        self.current.clear()
+        self.closed.clear()
+        self.total.clear()
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = SampleSpool(self.max_rows)
+
+    def close(self) -> None:
+        if self.spool is not None:
+            self.spool.close()
+            self.spool = None
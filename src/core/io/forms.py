@@ -9,6 +9,8 @@ def discover_serial_ports():
 
 
 def dynamic_arduino_form():
+    from core.utils.constant_helper import get_config, get_custom_config
+
     form = FormLayout()
 
     # =========================
@@ -24,8 +26,12 @@ def dynamic_arduino_form():
         "baudrate",
         "Baudrate",
         ["300", "1200", "2400", "4800", "9600", "19200", "38400", "57600", "115200"],
-        default="115200",
+        default=str(get_custom_config().get("default_baudrate", 115200)),
         required=True,
+    ).add_checkbox(
+        "auto_detect",
+        "Auto-detect Baudrate & Format",
+        default=bool(get_custom_config().get("auto_detect", True)),
     )
 
     # =========================
@@ -62,8 +68,6 @@ def dynamic_arduino_form():
     # =========================
     # Actions
     # =========================
-    from core.utils.constant_helper import get_config
-
     conf = get_config().get("connection", {})
     url = f"http://{conf.get('ip','127.0.0.1')}:{conf.get('port','')}"
 
@@ -73,7 +77,7 @@ def dynamic_arduino_form():
         {
             "method": "POST",
             "url": f"{url}/connect",
-            "payload_fields": ["serial_port", "baudrate"],
+            "payload_fields": ["serial_port", "baudrate", "auto_detect"],
         },
     )
 
@@ -81,6 +85,8 @@ def dynamic_arduino_form():
 
 
 def form_dict_to_input(data: dict) -> FormInput:
+    from core.utils.constant_helper import get_custom_config
+
     line_key = data.get("line_key") or uuid4().hex[:6]
 
     def safe_int(val, default=None):
@@ -92,6 +98,9 @@ def form_dict_to_input(data: dict) -> FormInput:
     return FormInput(
         serial_port=data.get("serial_port", "AUTO"),
         baudrate=safe_int(data.get("baudrate"), 115200),
+        auto_detect=bool(
+            data.get("auto_detect", get_custom_config().get("auto_detect", True))
+        ),
         line_enable=bool(data.get("line_enable", True)),
         line_key=line_key,
         csv_enable=bool(data.get("csv_enable", False)),
@@ -0,0 +1,341 @@
+import json
+import time
+from dataclasses import dataclass, field, replace
+from typing import Optional, List, Dict, Any, Tuple
+
+import serial
+
+from core.models.form_input import FormInput
+
+CANDIDATE_BAUDRATES = [115200, 9600, 57600, 38400, 19200, 4800, 2400, 1200, 300]
+CSV_DELIMITERS = [",", ";", "\t", "|", " "]
+TIME_FIELDS = ("time", "timestamp", "ts", "t", "millis", "ms")
+
+BOOT_WAIT = 2.5  # seconds, opening the port resets Uno/Nano-class boards
+PROBE_BUDGET = 0.8  # seconds, probe phase once the device is talking
+PROBE_WINDOW = 0.15  # seconds, minimum sampling time per candidate baudrate
+POLL_INTERVAL = 0.005
+LINE_BYTES = 48  # realistic length of one sample line (JSON included)
+JUDGE_BYTES = 32  # enough bytes to reject a candidate as garbage
+ACCEPT_SCORE = 0.95
+MIN_SCORE = 0.8
+MIN_LINES = 3
+
+
+@dataclass
+class ProbeResult:
+    baudrate: int
+    score: float
+    fmt: Optional[str] = None  # "json" | "csv" | "line"
+    settings: Dict[str, Any] = field(default_factory=dict)
+
+    def apply(self, form: FormInput) -> FormInput:
+        """Return a copy of ``form`` locked to the detected baudrate/format."""
+        form = replace(form, baudrate=self.baudrate)
+        if not self.fmt:
+            return form
+        return replace(
+            form,
+            line_enable=self.fmt == "line",
+            csv_enable=self.fmt == "csv",
+            json_enable=self.fmt == "json",
+            **self.settings,
+        )
+
+
+def _to_float(val: Any) -> Optional[float]:
+    if isinstance(val, bool):
+        return None
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return None
+
+
+def candidate_window(baudrate: int) -> float:
+    """Time needed to receive ``MIN_LINES`` lines plus cut-off fragments."""
+    return max(PROBE_WINDOW, (MIN_LINES + 2) * LINE_BYTES * 10 / baudrate)
+
+
+def _sample(
+    ser: serial.Serial,
+    window: float,
+    wait: float,
+    idle_gap: float,
+    limit: Optional[float] = None,
+) -> Tuple[bytes, bool, Optional[float]]:
+    """Read for ``window`` seconds counted from the first byte.
+
+    Waits up to ``wait`` seconds for that first byte, returns early once the
+    capture is clearly decodable or clearly garbage, and never blocks in
+    ``read`` so neither the window nor the absolute ``limit`` is overshot.
+    Returns the bytes, whether they start on a line boundary (first byte
+    came after ``idle_gap`` of silence) and the monotonic time of the first
+    byte (``None`` if nothing arrived).
+    """
+    buf = bytearray()
+    started = time.monotonic()
+    deadline = started + wait
+    first_at: Optional[float] = None
+    aligned = False
+
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        waiting = ser.in_waiting
+        if not waiting:
+            time.sleep(min(POLL_INTERVAL, deadline - now))
+            continue
+        if first_at is None:
+            first_at = now
+            aligned = now - started >= idle_gap
+            deadline = now + window if limit is None else min(now + window, limit)
+        buf.extend(ser.read(waiting))
+
+        if (
+            score_bytes(buf) >= ACCEPT_SCORE
+            and len(split_lines(buf, aligned)) >= MIN_LINES
+        ):
+            break
+        # a long line may not have ended yet, only reject unprintable bytes
+        if len(buf) >= JUDGE_BYTES and printable_ratio(buf) < MIN_SCORE:
+            break
+
+    return bytes(buf), aligned, first_at
+
+
+def printable_ratio(data: bytes) -> float:
+    """Share of printable ASCII bytes (tabs and line breaks included)."""
+    if not data:
+        return 0.0
+    printable = sum(1 for b in data if 32 <= b < 127 or b in (9, 10, 13))
+    return printable / len(data)
+
+
+def score_bytes(data: bytes) -> float:
+    """``printable_ratio`` halved when no line break was seen."""
+    ratio = printable_ratio(data)
+    return ratio if b"\n" in data else ratio / 2
+
+
+def split_lines(data: bytes, aligned: bool = False) -> List[str]:
+    # the last chunk is always unterminated, the first one is cut mid-line
+    # unless the capture started on a line boundary
+    parts = data.decode(errors="ignore").replace("\r", "").split("\n")[:-1]
+    if not aligned:
+        parts = parts[1:]
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _parses(line: str, form: FormInput) -> bool:
+    """Whether ``SerialManager`` would parse ``line`` with ``form`` as is."""
+    if form.json_enable:
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            obj = None
+        if (
+            isinstance(obj, dict)
+            and obj.get(form.json_key_field or "key") is not None
+            and _to_float(obj.get(form.json_value_field or "value")) is not None
+        ):
+            return True
+    if form.csv_enable:
+        parts = line.split(form.csv_delimiter or ",")
+        idx = form.csv_value_index
+        if idx is not None and idx < len(parts) and _to_float(parts[idx]) is not None:
+            return True
+    if form.line_enable and _to_float(line) is not None:
+        return True
+    return False
+
+
+def _infer_json(lines: List[str], form: FormInput) -> Optional[Dict[str, Any]]:
+    objs = []
+    for line in lines:
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(obj, dict):
+            return None
+        objs.append(obj)
+
+    first = objs[0]
+    time_field = next((f for f in TIME_FIELDS if f in first), None)
+
+    key_field = form.json_key_field
+    if key_field not in first:
+        key_field = next(
+            (k for k, v in first.items() if isinstance(v, str)), None
+        )
+    value_field = form.json_value_field
+    if _to_float(first.get(value_field)) is None:
+        value_field = next(
+            (
+                k
+                for k, v in first.items()
+                if k not in (key_field, time_field) and _to_float(v) is not None
+            ),
+            None,
+        )
+    if key_field is None or value_field is None:
+        return None
+    if any(o.get(key_field) is None or _to_float(o.get(value_field)) is None for o in objs):
+        return None
+
+    return {
+        "json_key_field": key_field,
+        "json_value_field": value_field,
+        "json_time_field": time_field,
+    }
+
+
+def _pick_time_column(
+    rows: List[List[str]], num_cols: List[int], key_idx: Optional[int] = None
+) -> Optional[int]:
+    """Pick the column most likely to be a ``millis()``-style timestamp.
+
+    A candidate holds integer literals (``Serial.print(float)`` prints
+    "12.00"), never decreases, actually advances over the sample and strictly
+    increases per key, so one line per signal may share a timestamp but
+    slow or constant sensor readings are not mistaken for time. Among
+    candidates the widest range wins, then the rightmost column.
+    """
+    ranked = []
+    for i in num_cols:
+        if not all(r[i].isdigit() for r in rows):
+            continue
+        vals = [int(r[i]) for r in rows]
+        if any(b < a for a, b in zip(vals, vals[1:])):
+            continue
+        spread = vals[-1] - vals[0]
+        if spread <= 0:
+            continue
+        last: Dict[str, int] = {}
+        strict = True
+        for r, v in zip(rows, vals):
+            k = r[key_idx] if key_idx is not None else ""
+            if k in last and v <= last[k]:
+                strict = False
+                break
+            last[k] = v
+        if strict:
+            ranked.append((spread, i))
+    return max(ranked)[1] if ranked else None
+
+
+def _infer_csv(lines: List[str]) -> Optional[Dict[str, Any]]:
+    for delim in CSV_DELIMITERS:
+        rows = [[c.strip() for c in line.split(delim)] for line in lines]
+        width = len(rows[0])
+        if width < 2 or any(len(r) != width for r in rows):
+            continue
+
+        numeric = [
+            all(_to_float(r[i]) is not None for r in rows) for i in range(width)
+        ]
+        num_cols = [i for i in range(width) if numeric[i]]
+        if not num_cols:
+            continue
+        text_cols = [i for i in range(width) if not numeric[i]]
+
+        key_idx = text_cols[0] if text_cols else None
+        time_idx = None
+        if len(num_cols) > 1:
+            time_idx = _pick_time_column(rows, num_cols, key_idx)
+        value_idx = next(i for i in num_cols if i != time_idx)
+
+        return {
+            "csv_delimiter": delim,
+            "csv_key_index": key_idx,
+            "csv_value_index": value_idx,
+            "csv_time_index": time_idx,
+        }
+    return None
+
+
+def infer_format(lines: List[str], form: FormInput) -> Optional[ProbeResult]:
+    """Guess the line format of ``lines``; baudrate/score are filled by caller."""
+    if not lines:
+        return None
+    if all(_to_float(line) is not None for line in lines):
+        return ProbeResult(0, 0.0, "line")
+    if lines[0].startswith("{"):
+        settings = _infer_json(lines, form)
+        if settings:
+            return ProbeResult(0, 0.0, "json", settings)
+    settings = _infer_csv(lines)
+    if settings:
+        return ProbeResult(0, 0.0, "csv", settings)
+    return None
+
+
+def probe(
+    ser: serial.Serial,
+    form: FormInput,
+    budget: float = PROBE_BUDGET,
+    window: float = PROBE_WINDOW,
+    boot_wait: float = BOOT_WAIT,
+) -> Optional[ProbeResult]:
+    """Sample ``ser`` at candidate baudrates and pick the most decodable one.
+
+    Opening the port resets most boards, so the budget only starts once the
+    first bytes arrive (up to ``boot_wait`` seconds). Candidates are then
+    retuned in place, without a further reset, and low baudrates whose
+    sampling window no longer fits the remaining budget are skipped. The
+    port is left at the winning baudrate. Format fields are only inferred
+    when the sampled lines do not parse with the form's current settings.
+    Returns ``None`` if nothing readable arrived.
+    """
+    configured = int(form.baudrate)
+    candidates = [configured] + [b for b in CANDIDATE_BAUDRATES if b != configured]
+    deadline: Optional[float] = None
+    best: Optional[ProbeResult] = None
+    best_lines: List[str] = []
+
+    for baud in candidates:
+        win = max(window, candidate_window(baud))
+        if deadline is None:
+            # configured baudrate first, waiting out a bootloader reset
+            wait = boot_wait
+        else:
+            wait = deadline - time.monotonic()
+            if wait <= 0:
+                break
+            if win > wait:
+                continue
+
+        ser.baudrate = baud
+        ser.reset_input_buffer()
+        data, aligned, first_at = _sample(
+            ser, win, wait, idle_gap=max(0.02, 20 * 10 / baud), limit=deadline
+        )
+        if first_at is None:
+            if deadline is None:
+                break  # device is silent, nothing to detect
+            continue
+        if deadline is None:
+            deadline = first_at + max(budget, win)
+
+        score = score_bytes(data)
+        lines = split_lines(data, aligned)
+        if best is None or score > best.score:
+            best, best_lines = ProbeResult(baud, score), lines
+        if score >= ACCEPT_SCORE and len(lines) >= MIN_LINES:
+            break
+
+    if best is None or best.score < MIN_SCORE:
+        ser.baudrate = configured
+        return None
+
+    ser.baudrate = best.baudrate
+    ser.reset_input_buffer()
+    # keep the user's format as long as it already parses what we saw
+    if best_lines and all(_parses(line, form) for line in best_lines):
+        return best
+    fmt = infer_format(best_lines, form)
+    if fmt:
+        best.fmt, best.settings = fmt.fmt, fmt.settings
+    return best
@@ -8,6 +8,7 @@ import serial
 from serial.tools import list_ports
 
 from core.models.form_input import FormInput
+from core.io.probe import probe
 
 
 class SerialManager:
@@ -53,8 +54,28 @@ class SerialManager:
 
     async def start(self) -> None:
         self.ser = serial.Serial(self.port, self.baudrate, timeout=0.1)
+        if self.form.auto_detect:
+            await self._auto_detect()
         self._reader_task = self.loop.create_task(self._read_loop())
 
+    async def _auto_detect(self) -> None:
+        result = await self.loop.run_in_executor(None, probe, self.ser, self.form)
+        if result is None:
+            await self.error_queue.put(
+                {
+                    "type": "probe_no_signal",
+                    "error": f"nothing decodable on {self.port}, "
+                    f"keeping {self.baudrate} baud",
+                }
+            )
+            return
+        self.form = result.apply(self.form)
+        self.baudrate = result.baudrate
+        print(
+            f"{self._id} | probe: {self.baudrate} baud, "
+            f"format={result.fmt or 'unchanged'} score={result.score:.2f}"
+        )
+
     async def stop(self) -> None:
         self._stop_event.set()
         if self._reader_task:
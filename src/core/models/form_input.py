@@ -7,6 +7,7 @@ from uuid import uuid4
 class FormInput:
     serial_port: str = "AUTO"
     baudrate: int = 115200
+    auto_detect: bool = True
 
     line_enable: bool = True
     line_key: str = ""
@@ -1,4 +1,6 @@
 import asyncio
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
 from plotune_sdk import PlotuneRuntime
 
 from time import time
@@ -11,6 +13,7 @@ from core.io.stream_handler import ArduinoStreamHandler
 from core.io.serial import SerialManager
 from core.listener import ArduinoQueueListener, HandlerType
 from core.io.socket import SocketHandler
+from core.aggregation import WindowAggregator, iter_csv, iter_ndjson
 
 
 class ArduinoExtensionRunner:
@@ -25,6 +28,11 @@ class ArduinoExtensionRunner:
 
         self.listener = ArduinoQueueListener()
         self.socket = SocketHandler(self)
+        self.aggregator = WindowAggregator(
+            window=self.custom_config.get("stats_window", 10),
+            history=self.custom_config.get("stats_history", 60),
+            max_rows=self.custom_config.get("export_max_rows", 1_000_000),
+        )
 
         self.signals: Dict[str, Dict[str, str]] = {}
         self.index_sm: Dict[str, int] = {}
@@ -35,6 +43,7 @@ class ArduinoExtensionRunner:
 
         self._init_services()
         self._register_events()
+        self._build_routes()
 
     async def subscribe(self, key: str, handler: HandlerType):
         print("Subscribed", key, handler)
@@ -76,6 +85,7 @@ class ArduinoExtensionRunner:
         """
         self.runtime.server.on_event("/form")(self._handle_form)
         self.runtime.server.on_event("/form", method="POST")(self._new_connection)
+        self.runtime.server.on_event("/stop")(self._on_stop)
 
     def _build_routes(self):
         _server = self.runtime.server
@@ -83,7 +93,49 @@ class ArduinoExtensionRunner:
         async def connect_request(payload: dict):
             print(payload)
 
+        async def list_stats(start: Optional[float] = None, end: Optional[float] = None):
+            return {
+                key: self.aggregator.stats(key, start, end)
+                for key in self.aggregator.signals()
+            }
+
+        async def signal_stats(
+            signal_name: str,
+            start: Optional[float] = None,
+            end: Optional[float] = None,
+        ):
+            stats = self.aggregator.stats(signal_name, start, end)
+            if stats is None:
+                raise HTTPException(status_code=404, detail="Unknown signal")
+            return stats
+
+        async def export(
+            fmt: str = "csv",
+            signal: Optional[List[str]] = Query(None),
+            start: Optional[float] = None,
+            end: Optional[float] = None,
+            chunk_size: int = 5000,
+        ):
+            if self.aggregator.spool is None:
+                raise HTTPException(status_code=404, detail="Export disabled")
+            # the spool is written from the event loop, so flush and snapshot
+            # it here rather than in Starlette's worker thread
+            spool = self.aggregator.spool
+            chunks = spool.iter_chunks(
+                spool.snapshot(), chunk_size, signal, start, end
+            )
+            if fmt == "csv":
+                return StreamingResponse(iter_csv(chunks), media_type="text/csv")
+            if fmt == "columns":
+                return StreamingResponse(
+                    iter_ndjson(chunks), media_type="application/x-ndjson"
+                )
+            raise HTTPException(status_code=400, detail=f"Unsupported format {fmt}")
+
         _server.route("/connect", method="POST")(connect_request)
+        _server.route("/stats")(list_stats)
+        _server.route("/stats/{signal_name}")(signal_stats)
+        _server.route("/export")(export)
 
     async def _handle_form(self, data: dict):
         return dynamic_arduino_form()
@@ -178,6 +230,7 @@ class ArduinoExtensionRunner:
             return
 
         unique_key = await self.check_signal(sm_id, msg)
+        self.aggregator.add(unique_key, msg.get("value"), msg.get("time"))
 
         # gather handlers for both the base key and the unique_key
         handlers = []
@@ -207,5 +260,12 @@ class ArduinoExtensionRunner:
             return
         print(f"{sm_id} | {_type}\t{_line}")
 
+    async def _on_stop(self, request):
+        # serial managers keep running, so start a fresh stats/export session
+        self.aggregator.reset()
+
     def start(self):
-        self.runtime.start()
+        try:
+            self.runtime.start()
+        finally:
+            self.aggregator.close()
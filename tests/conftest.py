@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the extension runs with src/ as its working directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+# plotune_sdk pulls in pystray, which needs a display unless told otherwise
+os.environ.setdefault("PYSTRAY_BACKEND", "dummy")
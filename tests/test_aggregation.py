@@ -0,0 +1,205 @@
+import json
+import math
+import os
+import random
+import statistics
+
+import pytest
+
+from core.aggregation import (
+    P2Quantile,
+    SampleSpool,
+    SignalStats,
+    WindowAggregator,
+    iter_csv,
+    iter_ndjson,
+)
+
+
+@pytest.fixture
+def agg():
+    a = WindowAggregator(window=1.0, history=5)
+    yield a
+    a.close()
+
+
+def test_p2_quantile_small_samples():
+    est = P2Quantile(0.5)
+    assert est.value is None
+    for x in (3.0, 1.0, 2.0):
+        est.add(x)
+    assert est.value == 2.0
+
+
+@pytest.mark.parametrize("p", [0.5, 0.9, 0.99])
+def test_p2_quantile_tracks_exact(p):
+    rnd = random.Random(7)
+    xs = [rnd.gauss(5, 2) for _ in range(20000)]
+    est = P2Quantile(p)
+    for x in xs:
+        est.add(x)
+    exact = statistics.quantiles(xs, n=100)[round(p * 100) - 1]
+    assert est.value == pytest.approx(exact, abs=0.1)
+
+
+def test_p2_quantile_monotonic_input():
+    est = P2Quantile(0.5)
+    for x in range(1, 1002):
+        est.add(float(x))
+    assert est.value == pytest.approx(501, rel=0.01)
+
+
+def test_signal_stats_welford():
+    s = SignalStats()
+    for x in (2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0):
+        s.add(x)
+    d = s.to_dict()
+    assert d["count"] == 8
+    assert d["mean"] == pytest.approx(5.0)
+    assert d["variance"] == pytest.approx(32 / 7)
+    assert (d["min"], d["max"]) == (2.0, 9.0)
+
+
+def test_signal_stats_empty():
+    d = SignalStats().to_dict()
+    assert d["count"] == 0
+    assert d["mean"] is None and d["variance"] is None and d["min"] is None
+
+
+def test_signal_stats_merge_matches_single_pass():
+    rnd = random.Random(3)
+    xs = [rnd.uniform(-10, 10) for _ in range(500)]
+    whole, merged = SignalStats(), SignalStats()
+    for part in (xs[:100], xs[100:101], [], xs[101:]):
+        s = SignalStats()
+        for x in part:
+            s.add(x)
+            whole.add(x)
+        merged.merge(s)
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.variance == pytest.approx(whole.variance)
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+
+
+def test_windows_roll_on_received_time(agg):
+    # device millis in ts, host epoch in received
+    for i in range(30):
+        agg.add("t", float(i), ts=1000 + i, received=100.0 + i * 0.1)
+    stats = agg.stats("t")
+    assert [w["count"] for w in stats["windows"]] == [10, 10, 10]
+    assert stats["windows"][0]["window_start"] == 100.0
+    assert stats["total"]["count"] == 30
+
+
+def test_history_limit_and_late_samples(agg):
+    for i in range(10):
+        agg.add("t", 1.0, ts=0.0, received=float(i))
+    # clock stepped back: folded into the open window
+    agg.add("t", 2.0, ts=0.0, received=3.5)
+    windows = agg.stats("t")["windows"]
+    assert len(windows) == 6  # 5 closed + current
+    assert windows[-1]["window_start"] == 9.0
+    assert windows[-1]["count"] == 2
+
+
+def test_range_merges_selected_windows(agg):
+    for i in range(40):
+        agg.add("t", float(i), ts=0.0, received=i * 0.1)
+    stats = agg.stats("t", start=1.0, end=3.0)
+    assert stats["range"]["count"] == 20
+    assert stats["range"]["mean"] == pytest.approx(statistics.mean(range(10, 30)))
+    assert stats["range"]["variance"] == pytest.approx(statistics.variance(range(10, 30)))
+    assert (stats["range"]["window_start"], stats["range"]["window_end"]) == (1.0, 3.0)
+    assert stats["range"]["p50"] is None
+    assert "range" not in agg.stats("t")
+    assert agg.stats("t", start=100.0)["range"]["count"] == 0
+    assert agg.stats("missing") is None
+
+
+def test_non_finite_samples_are_skipped(agg):
+    for i in range(10):
+        agg.add("t", float(i), ts=float(i), received=float(i))
+        agg.add("t", float("nan"), ts=float(i), received=float(i))
+        agg.add("t", float("inf"), ts=float(i), received=float(i))
+        agg.add("t", 1.0, ts=float("nan"), received=float(i))
+    stats = agg.stats("t", start=0.0)
+    assert stats["total"]["count"] == 10
+    json.dumps(stats, allow_nan=False)
+    assert agg.spool.rows == 10
+
+
+def test_received_defaults_to_host_time(agg):
+    agg.add("t", 1.0, ts=5.0)
+    start = agg.stats("t")["windows"][0]["window_start"]
+    assert start > 1e9
+
+
+def test_spool_chunks_and_filters(agg):
+    for i in range(10):
+        agg.add("a,b" if i % 2 else "c", float(i), ts=float(i), received=100.0 + i)
+    spool = agg.spool
+    chunks = list(spool.iter_chunks(spool.snapshot(), chunk_size=3))
+    assert [len(c["time"]) for c in chunks] == [3, 3, 3, 1]
+    assert chunks[0] == {
+        "time": [0.0, 1.0, 2.0],
+        "received": [100.0, 101.0, 102.0],
+        "key": ["c", "a,b", "c"],
+        "value": [0.0, 1.0, 2.0],
+    }
+    chunks = list(
+        spool.iter_chunks(spool.snapshot(), keys=["a,b"], start=103.0, end=107.0)
+    )
+    assert chunks[0]["value"] == [3.0, 5.0]
+
+
+def test_spool_snapshot_ignores_later_rows(agg):
+    agg.add("t", 1.0, ts=0.0, received=0.0)
+    snap = agg.spool.snapshot()
+    agg.add("t", 2.0, ts=0.0, received=0.0)
+    chunks = list(agg.spool.iter_chunks(snap))
+    assert chunks[0]["value"] == [1.0]
+
+
+def test_iter_csv_and_ndjson(agg):
+    agg.add("a,b", 1.5, ts=10.0, received=100.0)
+    agg.add("c", 2.5, ts=11.0, received=101.0)
+    snap = agg.spool.snapshot()
+    text = "".join(iter_csv(agg.spool.iter_chunks(snap, chunk_size=1)))
+    assert text == 'time,received,key,value\n10.0,100.0,"a,b",1.5\n11.0,101.0,c,2.5\n'
+    lines = "".join(iter_ndjson(agg.spool.iter_chunks(snap))).splitlines()
+    assert [json.loads(l)["key"] for l in lines] == [["a,b", "c"]]
+    assert "".join(iter_csv(iter([]))) == "time,received,key,value\n"
+
+
+def test_spool_rotation_caps_rows():
+    spool = SampleSpool(max_rows=10)
+    try:
+        for i in range(23):
+            spool.append(float(i), float(i), "t", float(i))
+        assert len(spool.segments) == 2
+        assert 5 <= spool.rows <= 10
+        values = [
+            v for c in spool.iter_chunks(spool.snapshot()) for v in c["value"]
+        ]
+        assert values == [float(i) for i in range(23 - spool.rows, 23)]
+    finally:
+        paths = [p for p, _ in spool.segments]
+        spool.close()
+    assert not any(os.path.exists(p) for p in paths)
+
+
+def test_reset_and_close(agg):
+    agg.add("t", 1.0, ts=0.0, received=0.0)
+    snap = agg.spool.snapshot()
+    chunks = agg.spool.iter_chunks(snap)
+    old = [p for p, _ in snap]
+    agg.reset()
+    assert agg.signals() == [] and agg.spool.rows == 0
+    assert not any(os.path.exists(p) for p in old)
+    # an export opened before the reset still completes
+    assert next(chunks)["value"] == [1.0]
+    new = [p for p, _ in agg.spool.segments]
+    agg.close()
+    assert agg.spool is None
+    assert not any(os.path.exists(p) for p in new)
@@ -0,0 +1,173 @@
+import itertools
+import time
+
+import pytest
+
+from core.io import probe as P
+from core.models.form_input import FormInput
+
+
+class FakeSerial:
+    """Releases ``lines`` at ``true_baud`` line rate; other rates read garbage."""
+
+    def __init__(self, true_baud, lines, boot=0.0):
+        self.true_baud = true_baud
+        self.baudrate = true_baud
+        self._data = bytearray()
+        self._lines = itertools.cycle(lines) if lines else iter(())
+        self._t0 = time.monotonic() + boot
+        self._pos = 0
+
+    def _available(self):
+        elapsed = time.monotonic() - self._t0
+        if elapsed <= 0:
+            return 0
+        want = int(elapsed * self.true_baud / 10)
+        while len(self._data) < want:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._data.extend(line.encode() + b"\r\n")
+        return min(want, len(self._data))
+
+    @property
+    def in_waiting(self):
+        return max(0, self._available() - self._pos)
+
+    def reset_input_buffer(self):
+        self._pos = self._available()
+
+    def read(self, n):
+        chunk = bytes(self._data[self._pos : self._pos + n])
+        self._pos += len(chunk)
+        if self.baudrate == self.true_baud:
+            return chunk
+        return bytes(0xF0 | (b & 0x0F) for b in chunk)
+
+
+def test_score_bytes():
+    assert P.score_bytes(b"") == 0.0
+    assert P.score_bytes(b"1.5\n2.5\n") == 1.0
+    assert P.score_bytes(b"1.5 2.5") == 0.5
+    assert P.printable_ratio(b"1.5 2.5") == 1.0
+    assert P.score_bytes(b"\xf0\xf1\n") < P.MIN_SCORE
+
+
+def test_split_lines():
+    assert P.split_lines(b"a\r\nb\r\nc") == ["b"]
+    assert P.split_lines(b"a\r\nb\r\nc", aligned=True) == ["a", "b"]
+    assert P.split_lines(b"partial") == []
+
+
+@pytest.mark.parametrize(
+    "lines, expected",
+    [
+        (
+            ['{"key": "temp", "value": 1.5, "time": 10}'] * 3,
+            {"json_key_field": "key", "json_value_field": "value", "json_time_field": "time"},
+        ),
+        (
+            ['{"sensor": "temp", "v": 1.5}'] * 3,
+            {"json_key_field": "sensor", "json_value_field": "v", "json_time_field": None},
+        ),
+        (['{"a": 1}', "[1, 2]"], None),
+        (['{"v": 1.5}'] * 3, None),
+    ],
+)
+def test_infer_json(lines, expected):
+    assert P._infer_json(lines, FormInput()) == expected
+
+
+@pytest.mark.parametrize(
+    "lines, delim, key_idx, value_idx, time_idx",
+    [
+        # one burst of examples/arduino_example: shared millis, cannot tell
+        (["temperature,12.00,1000", "voltage,200.00,1000", "speed,50.00,1000"], ",", 0, 1, None),
+        # two bursts: timestamp advances per key
+        (
+            [
+                "temperature,12.00,1000",
+                "voltage,200.00,1000",
+                "temperature,13.00,1500",
+                "voltage,210.00,1500",
+            ],
+            ",", 0, 1, 2,
+        ),
+        (["s,1.0,1000", "s,2.0,1500", "s,3.0,2000"], ",", 0, 1, 2),
+        (["100;2.5;3.5", "101;2.6;3.1"], ";", None, 1, 0),
+        # slow or constant sensors must not become the timestamp
+        (["23.50,40.10", "23.50,40.10", "23.50,40.20"], ",", None, 0, None),
+        (["512,1023", "512,1023", "513,1023"], ",", None, 0, None),
+        (["a\t1", "b\t2"], "\t", 0, 1, None),
+    ],
+)
+def test_infer_csv(lines, delim, key_idx, value_idx, time_idx):
+    assert P._infer_csv(lines) == {
+        "csv_delimiter": delim,
+        "csv_key_index": key_idx,
+        "csv_value_index": value_idx,
+        "csv_time_index": time_idx,
+    }
+
+
+def test_infer_csv_rejects_ragged_and_text_only():
+    assert P._infer_csv(["a,b", "c,d"]) is None
+    assert P._infer_csv(["1,2", "1,2,3"]) is None
+
+
+def test_pick_time_column_needs_advancing_integers():
+    rows = [["1", "5"], ["2", "5"], ["3", "5"]]
+    assert P._pick_time_column(rows, [0, 1]) == 0
+    assert P._pick_time_column([["1", "5"], ["1", "5"]], [0, 1]) is None
+
+
+@pytest.mark.parametrize(
+    "lines, fmt",
+    [
+        (["1.5", "-2", "nan"], "line"),
+        (['{"key": "t", "value": 1}'] * 2, "json"),
+        (["t,1", "t,2"], "csv"),
+        (["hello world", "more text"], None),
+        ([], None),
+    ],
+)
+def test_infer_format(lines, fmt):
+    result = P.infer_format(lines, FormInput())
+    assert (result.fmt if result else None) == fmt
+
+
+def test_probe_finds_baudrate_and_format():
+    ser = FakeSerial(57600, ["t,1.0", "t,2.0", "t,3.0"])
+    result = P.probe(ser, FormInput(baudrate=115200), boot_wait=0.5)
+    assert result.baudrate == 57600
+    assert ser.baudrate == 57600
+    form = result.apply(FormInput(baudrate=115200))
+    assert form.csv_enable and not form.line_enable
+    assert form.csv_value_index == 1
+
+
+def test_probe_long_lines_at_slow_rate():
+    line = '{"key":"temp","value":23.50,"time":123456}'
+    ser = FakeSerial(9600, [line], boot=0.05)
+    result = P.probe(ser, FormInput(baudrate=9600), boot_wait=0.5)
+    assert result is not None
+    assert result.baudrate == 9600
+    assert result.fmt == "json"
+
+
+def test_probe_keeps_working_user_format():
+    form = FormInput(
+        baudrate=9600, line_enable=False, csv_enable=True, csv_time_index=2
+    )
+    ser = FakeSerial(9600, ["temperature,12.00,1000", "voltage,200.00,1000"])
+    result = P.probe(ser, form, boot_wait=0.5)
+    assert result.fmt is None
+    assert result.apply(form).csv_time_index == 2
+
+
+def test_probe_silent_port():
+    ser = FakeSerial(9600, [])
+    start = time.monotonic()
+    assert P.probe(ser, FormInput(baudrate=9600), boot_wait=0.1) is None
+    assert time.monotonic() - start < 0.5
+    assert ser.baudrate == 9600